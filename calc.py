@@ -1,8 +1,99 @@
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-from config import TT_LightBlue, TT_Orange, TT_DarkBlue, TT_MidBlue, TT_Grey, TT_Purple, material_props, BARRIER_LENGTH
+import streamlit as st
+from config import TT_LightBlue, TT_Orange, TT_DarkBlue, TT_MidBlue, material_props, BARRIER_LENGTH
 
+SECTION_COLUMNS = ["Supplier", "Profile Name", "Material", "Reinf", "Depth", "Iyy", "Wyy"]
+
+# (wind load, barrier load) moment factors for each ULS combination, keyed by the case prefix
+ULS_FACTORS = {
+    "ULS 1": (1.5, 0.75),
+    "ULS 2": (0.75, 1.5),
+    "ULS 3": (1.5, 0.0),
+    "ULS 4": (0.0, 1.5),
+}
+
+# Lever-arm term of the barrier point-load deflection formula (mm²)
+BARRIER_LENGTH_SQ = BARRIER_LENGTH * BARRIER_LENGTH
+
+# Numeric columns of the section table and the precision they are rounded to
+DISPLAY_FORMATS = {
+    "Depth": "{:g}",
+    "Z (cm³)": "{:.2f}",
+    "I (cm⁴)": "{:.2f}",
+    "ULS Util. (%)": "{:.1f}",
+    "SLS Util. (%)": "{:.1f}",
+}
+
+# Static parts of the figures, passed straight to the go.Figure constructor so each
+# figure is validated once instead of via add_shape/add_trace/update_layout calls
+MARKER_STYLE = dict(size=15, line=dict(color='black', width=1))
+DESIGN_PLOT_LAYOUT = dict(xaxis_title="Section Depth (mm)", height=650)
+BAND_STYLE = dict(type="rect", opacity=0.2, line_width=0)
+CAMERAS_3D = {
+    "Isometric: Overview": dict(eye=dict(x=1.25, y=1.25, z=1.25)),
+    "XY Plane: Utilisation": dict(eye=dict(x=0, y=0, z=2.5), projection=dict(type='orthographic')),
+    "XZ Plane: Section Depth": dict(eye=dict(x=0, y=2.5, z=0), projection=dict(type='orthographic')),
+}
+
+
+@st.cache_data(show_spinner=False)
+def _filter_sections(df_selected, plot_material, selected_suppliers):
+    """Sections of plot_material from the selected suppliers (a frozenset: hashable and order-independent)."""
+    mask = (df_selected["Material"].eq(plot_material).values &
+            df_selected["Supplier"].isin(selected_suppliers).values)
+    return df_selected.loc[mask, SECTION_COLUMNS].reset_index(drop=True)
+
+
+def _deflection_coefficient(SLS_case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E):
+    """k such that a section's SLS deflection (mm) is k / Iyy, with Iyy in mm⁴."""
+    L2 = mullion_length * mullion_length
+    if SLS_case.startswith("SLS 1"):
+        # Wind load UDL, midspan deflection
+        return (5 * wind_pressure * 0.001 * bay_width * L2 * L2) / (384 * E)
+    # Barrier point load at BARRIER_LENGTH, deflection at midspan
+    F_BL = selected_barrier_load * bay_width
+    return ((F_BL * BARRIER_LENGTH) / (12 * E)) * (0.75 * L2 - BARRIER_LENGTH_SQ)
+
+
+def required_inertia(SLS_case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E, defl_limit):
+    """Iyy (mm⁴) at which the SLS deflection equals defl_limit."""
+    k_sls = _deflection_coefficient(SLS_case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E)
+    return k_sls / defl_limit
+
+
+def deflection_limit(mullion_length):
+    """Allowable SLS deflection (mm) for a mullion of the given length (mm)."""
+    if mullion_length <= 3000:
+        return mullion_length / 200
+    if mullion_length < 7500:
+        return 5 + mullion_length / 300
+    return mullion_length / 250
+
+
+def _background_bands(x_min, x_max, light_range, mid_range):
+    """Light and mid blue background rectangles spanning the x range, each given as (y0, y1)."""
+    return [
+        dict(x0=x_min, x1=x_max, y0=light_range[0], y1=light_range[1], fillcolor=TT_LightBlue, **BAND_STYLE),
+        dict(x0=x_min, x1=x_max, y0=mid_range[0], y1=mid_range[1], fillcolor=TT_MidBlue, **BAND_STYLE),
+    ]
+
+
+def _section_utilisation(Wyy, Iyy, Z_req_cm3, k_sls, defl_limit):
+    """Deflection (mm), ULS and SLS utilisation for every section in one pass.
+
+    Wyy (mm³) and Iyy (mm⁴) are float64 arrays; a zero modulus gives an infinite ULS utilisation.
+    """
+    defl = k_sls / Iyy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        uls_util = Z_req_cm3 / (Wyy / 1000)
+    sls_util = defl / defl_limit
+    return defl, uls_util, sls_util
+
+# The figures are shared rather than unpickled per rerun (which costs nearly as much as
+# building them); callers only read them
+@st.cache_resource(show_spinner=False, max_entries=64)
 def generate_plots(
     wind_pressure, bay_width, mullion_length, selected_barrier_load,
     ULS_case, SLS_case, df_selected, plot_material, selected_suppliers,
@@ -13,268 +104,202 @@ def generate_plots(
     L = mullion_length
     bay = bay_width
     w = p * bay
-    M_WL = (w * L**2) / 8
+    L2 = L * L
+    M_WL = (w * L2) / 8
     M_BL = ((selected_barrier_load * bay) * BARRIER_LENGTH) / 2
 
-    if ULS_case.startswith("ULS 1"):
-        M_ULS = 1.5 * M_WL + 0.75 * M_BL
-    elif ULS_case.startswith("ULS 2"):
-        M_ULS = 0.75 * M_WL + 1.5 * M_BL
-    elif ULS_case.startswith("ULS 3"):
-        M_ULS = 1.5 * M_WL
-    elif ULS_case.startswith("ULS 4"):
-        M_ULS = 1.5 * M_BL
-    else:
-        M_ULS = 0
-
-    fy = material_props[plot_material]["fy"]
+    wl_factor, bl_factor = ULS_FACTORS.get(ULS_case[:5], (0.0, 0.0))
+    M_ULS = wl_factor * M_WL + bl_factor * M_BL
+
+    props = material_props[plot_material]
+    fy = props["fy"]
+    E = props["E"]
     Z_req = M_ULS / fy          # in mm³
     Z_req_cm3 = Z_req / 1000     # in cm³
 
-    # Deflection limit based on mullion length
-    if L <= 3000:
-        defl_limit = L / 200
-    elif L < 7500:
-        defl_limit = 5 + L / 300
-    else:
-        defl_limit = L / 250
+    defl_limit = deflection_limit(L)
 
     # Filter the dataframe based on material and selected suppliers
-    df_mat = df_selected[(df_selected["Material"] == plot_material) & 
-                         (df_selected["Supplier"].isin(selected_suppliers))]
+    df_mat = _filter_sections(df_selected, plot_material, frozenset(selected_suppliers))
     if df_mat.empty:
         raise ValueError("No sections selected.")
 
-    depths = df_mat["Depth"].values
-    Wyy_vals = df_mat["Wyy"].values
-    Iyy_vals = df_mat["Iyy"].values
-    profiles = df_mat["Profile Name"].values
-    reinf = df_mat["Reinf"].values
-    supps = df_mat["Supplier"].values
-    available_cm3 = Wyy_vals / 1000  # Convert to cm³
+    # Take the numeric columns as float64 arrays once and keep the downstream maths vectorised
+    depths = df_mat["Depth"].to_numpy(dtype=np.float64, copy=False)
+    Wyy_vals = df_mat["Wyy"].to_numpy(dtype=np.float64, copy=False)
+    Iyy_vals = df_mat["Iyy"].to_numpy(dtype=np.float64, copy=False)
+    profiles = df_mat["Profile Name"].to_numpy(copy=False)
+    reinf = df_mat["Reinf"].to_numpy(copy=False)
+    supps = df_mat["Supplier"].to_numpy(copy=False)
 
-    # Add custom section if enabled
+    # Add custom section if enabled: one concatenation per column, and
+    # available_cm3 is derived afterwards rather than appended separately
     if use_custom_section and custom_section_data:
-        depths = np.append(depths, custom_section_data["depth"])
-        # Use custom_section_data["Z"] instead of "modulus"
-        Wyy_vals = np.append(Wyy_vals, custom_section_data["Z"] * 1000)  # cm³ -> mm³
-        Iyy_vals = np.append(Iyy_vals, custom_section_data["I"] * 10000)   # cm⁴ -> mm⁴
-        profiles = np.append(profiles, custom_section_data["name"])
+        depths = np.concatenate([depths, np.array([custom_section_data["depth"]], dtype=np.float64)])
+        Wyy_vals = np.concatenate([Wyy_vals, np.array([custom_section_data["Z"] * 1000], dtype=np.float64)])  # cm³ -> mm³
+        Iyy_vals = np.concatenate([Iyy_vals, np.array([custom_section_data["I"] * 10000], dtype=np.float64)])  # cm⁴ -> mm⁴
+        profiles = np.concatenate([profiles, [custom_section_data["name"]]])
         # Set a default no-reinforcement flag and supplier "Custom"
-        reinf = np.append(reinf, False)
-        supps = np.append(supps, "Custom")
-        available_cm3 = np.append(available_cm3, custom_section_data["Z"])
+        reinf = np.concatenate([reinf, [False]])
+        supps = np.concatenate([supps, ["Custom"]])
+    available_cm3 = Wyy_vals / 1000  # Convert to cm³
 
     # ----- ULS Plot -----
     uls_passed = available_cm3 >= Z_req_cm3
-    uls_colors = []
-    for i, passed in enumerate(uls_passed):
-        if i == len(uls_passed) - 1 and use_custom_section:
-            uls_colors.append(TT_DarkBlue if passed else TT_Orange)
-        else:
-            uls_colors.append('seagreen' if passed else 'darkred')
-    uls_symbols = ['square' if r else 'circle' for r in reinf]
+    uls_colors = np.where(uls_passed, 'seagreen', 'darkred').astype(object)
+    if use_custom_section:
+        # The custom section is always the last entry
+        uls_colors[-1] = TT_DarkBlue if uls_passed[-1] else TT_Orange
+    uls_symbols = np.where(reinf.astype(bool), 'square', 'circle').astype(object)
     uls_hover = [
-        f"{profiles[i]}<br>Supplier: {supps[i]}<br>Depth: {depths[i]} mm<br>Z: {available_cm3[i]:.2f} cm³<br>ULS: {'Pass' if uls_passed[i] else 'Fail'}"
-        for i in range(len(depths))
+        f"{prof}<br>Supplier: {supp}<br>Depth: {d:g} mm<br>Z: {z:.2f} cm³<br>ULS: {'Pass' if ok else 'Fail'}"
+        for prof, supp, d, z, ok in zip(
+            profiles.tolist(), supps.tolist(), depths.tolist(), available_cm3.tolist(), uls_passed.tolist()
+        )
     ]
     x_min = np.min(depths) * 0.95
     x_max = np.max(depths) * 1.05
     uls_ymax = 4 * Z_req_cm3
 
-    uls_fig = go.Figure()
-    uls_fig.add_shape(
-        type="rect",
-        x0=x_min, x1=x_max,
-        y0=Z_req_cm3, y1=uls_ymax,
-        fillcolor=TT_LightBlue, opacity=0.2, line_width=0
-    )
-    uls_fig.add_shape(
-        type="rect",
-        x0=x_min, x1=x_max,
-        y0=0, y1=Z_req_cm3,
-        fillcolor=TT_MidBlue, opacity=0.2, line_width=0
-    )
-    uls_fig.add_trace(go.Scatter(
-        x=depths,
-        y=available_cm3,
-        mode='markers',
-        marker=dict(color=uls_colors, symbol=uls_symbols, size=15, line=dict(color='black', width=1)),
-        text=uls_hover,
-        hoverinfo='text'
-    ))
-    uls_fig.update_layout(
-        title=(f"{plot_material} ULS Design ({ULS_case})<br>"
-               f"WL: {wind_pressure:.2f} kPa, Bay: {bay} mm, L: {L} mm, BL: {selected_barrier_load:.2f} kN/m<br>"
-               f"Req. Z: {Z_req_cm3:.1f} cm³"),
-        xaxis_title="Section Depth (mm)",
-        yaxis_title="Section Modulus (cm³)",
-        xaxis=dict(range=[x_min, x_max]),
-        yaxis=dict(range=[0, uls_ymax]),
-        height=650
+    uls_fig = go.Figure(
+        data=[go.Scatter(
+            x=depths,
+            y=available_cm3,
+            mode='markers',
+            marker=dict(color=uls_colors, symbol=uls_symbols, **MARKER_STYLE),
+            text=uls_hover,
+            hoverinfo='text'
+        )],
+        layout=dict(
+            shapes=_background_bands(x_min, x_max, (Z_req_cm3, uls_ymax), (0, Z_req_cm3)),
+            title=(f"{plot_material} ULS Design ({ULS_case})<br>"
+                   f"WL: {wind_pressure:.2f} kPa, Bay: {bay} mm, L: {L} mm, BL: {selected_barrier_load:.2f} kN/m<br>"
+                   f"Req. Z: {Z_req_cm3:.1f} cm³"),
+            yaxis_title="Section Modulus (cm³)",
+            xaxis=dict(range=[x_min, x_max]),
+            yaxis=dict(range=[0, uls_ymax]),
+            **DESIGN_PLOT_LAYOUT
+        )
     )
 
     # ----- SLS Plot -----
-    E = material_props[plot_material]["E"]
-    defl_values = []
-    sls_hover = []
-    
+    # Deflection = k / I, where k depends only on the load case (wind UDL or barrier point load)
+    k_sls = _deflection_coefficient(SLS_case, wind_pressure, bay, L, selected_barrier_load, E)
+
     # Calculate the required moment of inertia based on the deflection limit
-    if SLS_case.startswith("SLS 1"):
-        # For wind load case
-        I_req = (5 * w * L**4) / (384 * E * defl_limit)
-    else:
-        # For barrier load case
-        F_BL = selected_barrier_load * bay
-        I_req = ((F_BL * BARRIER_LENGTH) / (12 * E * defl_limit)) * (0.75 * L**2 - BARRIER_LENGTH**2)
+    I_req = k_sls / defl_limit
     
     # Convert I_req to cm⁴ for display
     I_req_cm4 = I_req / 10000  # Convert from mm⁴ to cm⁴
     
-    for i in range(len(depths)):
-        d_wl = (5 * w * L**4) / (384 * E * Iyy_vals[i])
-        F_BL = selected_barrier_load * bay
-        d_bl = ((F_BL * BARRIER_LENGTH) / (12 * E * Iyy_vals[i])) * (0.75 * L**2 - BARRIER_LENGTH**2)
-        defl_total = d_wl if SLS_case.startswith("SLS 1") else d_bl
-        defl_values.append(defl_total)
-        sls_hover.append(
-            f"{profiles[i]}<br>Supplier: {supps[i]}<br>Depth: {depths[i]} mm<br>Defl: {defl_total:.2f} mm<br>"
-            f"SLS: {'Pass' if defl_total <= defl_limit else 'Fail'}"
-        )
+    # Deflection and utilisation for every section in one pass
+    defl_values, uls_ratio, sls_ratio = _section_utilisation(Wyy_vals, Iyy_vals, Z_req_cm3, k_sls, defl_limit)
     sls_ymax = 1.33 * defl_limit
+    # Only sections passing ULS are shown on the SLS plot
     valid = np.where(uls_passed)[0]
-    sls_colors = []
-    for i in valid:
-        if i == len(uls_passed) - 1 and use_custom_section:
-            sls_colors.append(TT_DarkBlue if defl_values[i] <= defl_limit else TT_Orange)
-        else:
-            sls_colors.append('seagreen' if defl_values[i] <= defl_limit else 'darkred')
-    sls_fig = go.Figure()
-    sls_fig.add_shape(
-        type="rect",
-        x0=x_min, x1=x_max,
-        y0=0, y1=defl_limit,
-        fillcolor=TT_LightBlue, opacity=0.2, line_width=0
-    )
-    sls_fig.add_shape(
-        type="rect",
-        x0=x_min, x1=x_max,
-        y0=defl_limit, y1=sls_ymax,
-        fillcolor=TT_MidBlue, opacity=0.2, line_width=0
-    )
-    sls_fig.add_trace(go.Scatter(
-        x=depths[valid],
-        y=np.array(defl_values)[valid],
-        mode='markers',
-        marker=dict(
-            color=sls_colors,
-            symbol=[uls_symbols[i] for i in valid],
-            size=15,
-            line=dict(color='black', width=1)
-        ),
-        text=np.array(sls_hover)[valid],
-        hoverinfo='text'
-    ))
-    sls_fig.update_layout(
-        title={
-            'text': (f"{plot_material} SLS Design ({SLS_case})<br>"
-                    f"WL: {wind_pressure:.2f} kPa, Bay: {bay} mm, L: {L} mm, BL: {selected_barrier_load:.2f} kN/m<br>"
-                    f"Defl Limit: {defl_limit:.1f} mm, Req. I: {I_req_cm4:.1f} cm⁴"),
-            'x': 0.5,
-            'xanchor': 'center'
-        },
-        xaxis_title="Section Depth (mm)",
-        yaxis_title="Deflection (mm)",
-        xaxis=dict(range=[x_min, x_max]),
-        yaxis=dict(range=[0, sls_ymax]),
-        height=650
+    sls_passed = defl_values[valid] <= defl_limit
+    sls_hover = [
+        f"{prof}<br>Supplier: {supp}<br>Depth: {d:g} mm<br>Defl: {defl:.2f} mm<br>"
+        f"SLS: {'Pass' if ok else 'Fail'}"
+        for prof, supp, d, defl, ok in zip(
+            profiles[valid].tolist(), supps[valid].tolist(), depths[valid].tolist(),
+            defl_values[valid].tolist(), sls_passed.tolist()
+        )
+    ]
+    sls_colors = np.where(sls_passed, 'seagreen', 'darkred').astype(object)
+    if use_custom_section and len(valid) > 0 and valid[-1] == len(uls_passed) - 1:
+        sls_colors[-1] = TT_DarkBlue if sls_passed[-1] else TT_Orange
+    sls_fig = go.Figure(
+        data=[go.Scatter(
+            x=depths[valid],
+            y=defl_values[valid],
+            mode='markers',
+            marker=dict(color=sls_colors, symbol=uls_symbols[valid], **MARKER_STYLE),
+            text=sls_hover,
+            hoverinfo='text'
+        )],
+        layout=dict(
+            shapes=_background_bands(x_min, x_max, (0, defl_limit), (defl_limit, sls_ymax)),
+            title={
+                'text': (f"{plot_material} SLS Design ({SLS_case})<br>"
+                        f"WL: {wind_pressure:.2f} kPa, Bay: {bay} mm, L: {L} mm, BL: {selected_barrier_load:.2f} kN/m<br>"
+                        f"Defl Limit: {defl_limit:.1f} mm, Req. I: {I_req_cm4:.1f} cm⁴"),
+                'x': 0.5,
+                'xanchor': 'center'
+            },
+            yaxis_title="Deflection (mm)",
+            xaxis=dict(range=[x_min, x_max]),
+            yaxis=dict(range=[0, sls_ymax]),
+            **DESIGN_PLOT_LAYOUT
+        )
     )
 
     # ----- 3D Utilisation Plot -----
-    uls_util, sls_util, depths_3d = [], [], []
-    safe_suppliers, safe_profiles = [], []
-    for i in range(len(depths)):
-        if available_cm3[i] == 0:
-            continue
-        ratio_uls = Z_req_cm3 / available_cm3[i]
-        ratio_sls = defl_values[i] / defl_limit if defl_limit != 0 else np.inf
-        if ratio_uls <= 1 and ratio_sls <= 1:
-            uls_util.append(ratio_uls)
-            sls_util.append(ratio_sls)
-            depths_3d.append(depths[i])
-            safe_suppliers.append(supps[i])
-            safe_profiles.append(profiles[i])
-    colors_3d = []
-    for i in range(len(safe_suppliers)):
-        if safe_suppliers[i] == "Custom" and use_custom_section:
-            colors_3d.append(TT_DarkBlue)
-        else:
-            colors_3d.append(TT_MidBlue)
-    if len(uls_util) > 0:
-        d_arr = np.sqrt(np.array(uls_util)**2 + np.array(sls_util)**2)
-        sizes = 10 + (d_arr / np.sqrt(2)) * 20
-    else:
-        sizes = 30
+    # Keep only sections that pass both ULS and SLS (zero-modulus rows excluded)
+    safe = (available_cm3 != 0) & (uls_ratio <= 1) & (sls_ratio <= 1)
+    uls_util = uls_ratio[safe]
+    sls_util = sls_ratio[safe]
+    depths_3d = depths[safe]
+    safe_suppliers = supps[safe]
+    safe_profiles = profiles[safe]
+    is_custom_3d = (safe_suppliers == "Custom") & use_custom_section
+    colors_3d = np.where(is_custom_3d, TT_DarkBlue, TT_MidBlue).astype(object)
+    # Distance from the origin in utilisation space, shared by marker size and recommendation
+    d_arr = np.hypot(uls_util, sls_util)
+    sizes = 10 + (d_arr / np.sqrt(2)) * 20 if len(d_arr) > 0 else 30
 
     recommended_text = "No suitable profile - choose a custom one!"
     if len(depths_3d) > 0:
-        min_depth_val = min(depths_3d)
-        indices = [i for i, d in enumerate(depths_3d) if d == min_depth_val]
-        if indices:
-            d_array = np.sqrt(np.array(uls_util)**2 + np.array(sls_util)**2)
-            rec_index = indices[0] if len(indices) == 1 else indices[np.argmax(d_array[indices])]
-            recommended_text = f"Recommended Profile: {safe_suppliers[rec_index]}: {safe_profiles[rec_index]}"
-
-    util_fig = go.Figure(data=[go.Scatter3d(
-        x=uls_util,
-        y=sls_util,
-        z=depths_3d,
-        mode='markers',
-        marker=dict(
-            size=sizes,
-            color=colors_3d if use_custom_section else depths_3d,
-            colorscale='Emrld' if not use_custom_section else None,
-            colorbar=dict(title="Depth (mm)") if not use_custom_section else None
-        ),
-        text=[f"{safe_suppliers[i]}: {safe_profiles[i]}<br>Depth: {depths_3d[i]} mm<br>"
-              f"ULS Util: {uls_util[i]:.2f}<br>SLS Util: {sls_util[i]:.2f}"
-              for i in range(len(depths_3d))],
-        hoverinfo='text'
-    )])
-    util_fig.update_layout(
-        height=650,
-        title=f"3D Utilisation Plot<br>{recommended_text}",
-        scene=dict(
-            xaxis=dict(range=[0.0, 1.0]),
-            yaxis=dict(range=[0.0, 1.0]),
-            zaxis=dict(range=[50, 1.05 * np.max(depths)]),
-            xaxis_title="ULS Utilisation",
-            yaxis_title="SLS Utilisation",
-            zaxis_title="Section Depth (mm)"
+        # Of the shallowest passing sections, recommend the most utilised one
+        shallowest = np.flatnonzero(depths_3d == depths_3d.min())
+        rec_index = shallowest[np.argmax(d_arr[shallowest])]
+        recommended_text = f"Recommended Profile: {safe_suppliers[rec_index]}: {safe_profiles[rec_index]}"
+
+    util_fig = go.Figure(
+        data=[go.Scatter3d(
+            x=uls_util,
+            y=sls_util,
+            z=depths_3d,
+            mode='markers',
+            marker=dict(
+                size=sizes,
+                color=colors_3d if use_custom_section else depths_3d,
+                colorscale='Emrld' if not use_custom_section else None,
+                colorbar=dict(title="Depth (mm)") if not use_custom_section else None
+            ),
+            text=[f"{supp}: {prof}<br>Depth: {d:g} mm<br>"
+                  f"ULS Util: {u:.2f}<br>SLS Util: {v:.2f}"
+                  for supp, prof, d, u, v in zip(
+                      safe_suppliers.tolist(), safe_profiles.tolist(), depths_3d.tolist(),
+                      uls_util.tolist(), sls_util.tolist()
+                  )],
+            hoverinfo='text'
+        )],
+        layout=dict(
+            height=650,
+            title=f"3D Utilisation Plot<br>{recommended_text}",
+            scene=dict(
+                xaxis=dict(range=[0.0, 1.0]),
+                yaxis=dict(range=[0.0, 1.0]),
+                zaxis=dict(range=[50, 1.05 * np.max(depths)]),
+                xaxis_title="ULS Utilisation",
+                yaxis_title="SLS Utilisation",
+                zaxis_title="Section Depth (mm)",
+                camera=CAMERAS_3D[view_3d_option]
+            )
         )
     )
-    if view_3d_option == "Isometric: Overview":
-        camera = dict(eye=dict(x=1.25, y=1.25, z=1.25))
-    elif view_3d_option == "XY Plane: Utilisation":
-        camera = dict(eye=dict(x=0, y=0, z=2.5), projection=dict(type='orthographic'))
-    elif view_3d_option == "XZ Plane: Section Depth":
-        camera = dict(eye=dict(x=0, y=2.5, z=0), projection=dict(type='orthographic'))
-    util_fig.update_layout(scene_camera=camera)
     
     return uls_fig, sls_fig, util_fig, defl_values, Z_req_cm3, defl_limit
 
 
-def generate_section_database(
+@st.cache_data(show_spinner=False, max_entries=64)
+def _section_table(
     df_selected, plot_material, selected_suppliers, custom_section_data, use_custom_section,
     wind_pressure, bay_width, mullion_length, selected_barrier_load, SLS_case, defl_limit, Z_req_cm3
 ):
-    from config import BARRIER_LENGTH, material_props, TT_LightBlue, TT_MidBlue, TT_Orange
-    import pandas as pd
-    import numpy as np
-    
-    df_mat = df_selected[(df_selected["Material"] == plot_material) &
-                         (df_selected["Supplier"].isin(selected_suppliers))].copy()
-    df_mat.reset_index(drop=True, inplace=True)
+    """Display table of the sections, passing ones first, and the number that pass."""
+    df_mat = _filter_sections(df_selected, plot_material, frozenset(selected_suppliers))
 
     if use_custom_section and custom_section_data:
         custom_row = pd.DataFrame({
@@ -292,36 +317,27 @@ def generate_section_database(
     df_mat["Iyy"] = pd.to_numeric(df_mat["Iyy"], errors="raise")
     df_mat["Wyy"] = pd.to_numeric(df_mat["Wyy"], errors="raise")
     
-    # Calculate ULS utilisation as the ratio of required section modulus to available modulus.
-    df_mat["ULS Utilisation"] = Z_req_cm3 / (df_mat["Wyy"] / 1000)
-
-    # Recompute deflection for each row
+    # ULS utilisation is the ratio of required to available section modulus,
+    # SLS utilisation the ratio of deflection to the deflection limit
     E = material_props[plot_material]["E"]
-    defl_values_table = []
-    for i, row in df_mat.iterrows():
-        Iyy_val = row["Iyy"]
-        d_wl = (5 * wind_pressure * 0.001 * bay_width * mullion_length**4) / (384 * E * Iyy_val)
-        F_BL = selected_barrier_load * bay_width
-        d_bl = ((F_BL * BARRIER_LENGTH) / (12 * E * Iyy_val)) * (0.75 * mullion_length**2 - BARRIER_LENGTH**2)
-        defl_total = d_wl if SLS_case.startswith("SLS 1") else d_bl
-        defl_values_table.append(defl_total)
-    df_mat["SLS Utilisation"] = np.array(defl_values_table) / defl_limit
+    k_sls = _deflection_coefficient(SLS_case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E)
+    _, uls_util, sls_util = _section_utilisation(
+        df_mat["Wyy"].to_numpy(dtype=np.float64), df_mat["Iyy"].to_numpy(dtype=np.float64),
+        Z_req_cm3, k_sls, defl_limit
+    )
+    df_mat["ULS Utilisation"] = uls_util
+    df_mat["SLS Utilisation"] = sls_util
 
     # Create a sorting metric and format the dataframe for display
     df_mat["Max Utilisation"] = df_mat[["ULS Utilisation", "SLS Utilisation"]].max(axis=1)
     
-    # Separate passing and failing sections
-    df_pass = df_mat[df_mat["Max Utilisation"] <= 1.0].copy()
-    df_fail = df_mat[df_mat["Max Utilisation"] > 1.0].copy()
-    
-    # Sort passing sections by SLS Utilisation (highest to lowest)
-    df_pass = df_pass.sort_values(by="SLS Utilisation", ascending=False)
-    
-    # Sort failing sections by Max Utilisation (lowest to highest)
-    df_fail = df_fail.sort_values(by="Max Utilisation", ascending=True)
-    
-    # Concatenate passing and failing dataframes
-    df_sorted = pd.concat([df_pass, df_fail], ignore_index=True)
+    # Passing sections first, sorted by SLS Utilisation (highest to lowest),
+    # then failing sections sorted by Max Utilisation (lowest to highest)
+    passing = (df_mat["Max Utilisation"] <= 1.0).to_numpy()
+    pass_count = int(passing.sum())
+    sort_key = np.where(passing, -df_mat["SLS Utilisation"].to_numpy(), df_mat["Max Utilisation"].to_numpy())
+    order = np.lexsort((sort_key, ~passing))
+    df_sorted = df_mat.iloc[order].reset_index(drop=True)
     
     # Create display dataframe with formatted columns
     df_display = df_sorted.copy()
@@ -332,48 +348,38 @@ def generate_section_database(
     
     display_columns = ["Supplier", "Profile Name", "Depth", "Z (cm³)", "I (cm⁴)", 
                        "ULS Util. (%)", "SLS Util. (%)"]
-    df_display = df_display[display_columns]
-    
-    # Create a styled dataframe for display
-    def style_dataframe(dataframe):
-        # Count passing sections for gradient calculation
-        pass_count = len(df_pass)
-        
-        # Define the style function for each row
-        def row_style(row):
-            styles = []
-            is_custom = row["Supplier"] == "Custom"
-            is_passing = row.name < pass_count
-            
-            # Custom section styling
-            if is_custom:
-                bg_color = TT_DarkBlue if is_passing else TT_Orange
-                styles = [f'background-color: {bg_color}; color: white'] * len(row)
-            
-            # Non-custom sections
-            else:
-                if is_passing:
-                    # Gradient with consistent opacity
-                    light_blue = tuple(int(x) for x in TT_LightBlue.strip("rgb()").split(","))
-                    mid_blue = tuple(int(x) for x in TT_MidBlue.strip("rgb()").split(","))
-                    
-                    ratio = row.name / max(1, pass_count - 1)
-                    r = int(light_blue[0] + (mid_blue[0] - light_blue[0]) * ratio)
-                    g = int(light_blue[1] + (mid_blue[1] - light_blue[1]) * ratio)
-                    b = int(light_blue[2] + (mid_blue[2] - light_blue[2]) * ratio)
-                    
-                    styles = [f'background-color: rgba({r},{g},{b},0.2)'] * len(row)
-                else:
-                    # Failing non-custom: consistent styling
-                    # Use rgba for background with 0.2 opacity
-                    orange_rgba = "rgba(211,69,29,0.2)"
-                    styles = [f'background-color: {orange_rgba}; color: {TT_Orange}'] * len(row)
-            
-            return styles
-        
-        return dataframe.style.apply(row_style, axis=1)
+    # float32 halves the Arrow payload sent to the browser; values are already rounded
+    df_display = df_display[display_columns].astype(dict.fromkeys(DISPLAY_FORMATS, "float32"))
+    return df_display, pass_count
+
+
+def generate_section_database(
+    df_selected, plot_material, selected_suppliers, custom_section_data, use_custom_section,
+    wind_pressure, bay_width, mullion_length, selected_barrier_load, SLS_case, defl_limit, Z_req_cm3
+):
+    # The table is cached; the Styler can't be pickled, so it is rebuilt on each call
+    df_display, pass_count = _section_table(
+        df_selected, plot_material, selected_suppliers, custom_section_data, use_custom_section,
+        wind_pressure, bay_width, mullion_length, selected_barrier_load, SLS_case, defl_limit, Z_req_cm3
+    )
     
-    # Apply styling to the dataframe
-    styled_df = style_dataframe(df_display)
+    # Precompute one CSS string per row and apply the whole style grid in one call
+    light_blue = np.array([int(x) for x in TT_LightBlue.strip("rgb()").split(",")])
+    mid_blue = np.array([int(x) for x in TT_MidBlue.strip("rgb()").split(",")])
+
+    # Passing sections: light-to-mid blue gradient with consistent opacity
+    ratio = np.arange(pass_count) / max(1, pass_count - 1)
+    gradient = (light_blue + (mid_blue - light_blue) * ratio[:, None]).astype(int)
+    row_styles = [f'background-color: rgba({r},{g},{b},0.2)' for r, g, b in gradient.tolist()]
+    # Failing non-custom: consistent styling, rgba background with 0.2 opacity
+    row_styles += [f'background-color: rgba(211,69,29,0.2); color: {TT_Orange}'] * (len(df_display) - pass_count)
+    # Custom section styling
+    for i in np.flatnonzero(df_display["Supplier"].to_numpy() == "Custom"):
+        bg_color = TT_DarkBlue if i < pass_count else TT_Orange
+        row_styles[i] = f'background-color: {bg_color}; color: white'
+
+    styles_df = pd.DataFrame({col: row_styles for col in df_display.columns}, index=df_display.index)
+    # Format to the rounded precision so the float32 columns don't display representation noise
+    styled_df = df_display.style.apply(lambda _: styles_df, axis=None).format(DISPLAY_FORMATS)
     
     return df_display, styled_df
@@ -1,93 +1,438 @@
 # custom_profile.py
+import copy
+import functools
+import hashlib
+import multiprocessing
 import tempfile
 import os
+import sys
+import threading
+import types
+import numpy as np
+import plotly.graph_objects as go
 import streamlit as st
-from sectionproperties.pre import Material
-from sectionproperties.pre.geometry import Geometry, CompoundGeometry
-from sectionproperties.analysis import Section
-import matplotlib.pyplot as plt
 from config import TT_LightBlue, TT_MidBlue
 
 
-# def get_custom_profile():
-#     """Process DXF with proper 90° rotation for mullion visualization"""
-#     custom_data = {
-#         "type": "dxf",
-#         "name": "DXF Profile",
-#         "depth": 150.0,
-#         "Z": 1.0,
-#         "I": 1.0
-#     }
-
-#     # Input row at top
-#     col1, col2 = st.columns(2)
-#     with col1:
-#         custom_data["name"] = st.text_input("Profile Name", value="DXF Profile")
-#     with col2:
-#         custom_data["depth"] = st.number_input("Section Depth (mm)", 
-#                                              min_value=50.0, max_value=500.0, 
-#                                              value=150.0, step=1.0)
-
-#     uploaded_file = st.file_uploader("Upload DXF File", type=["dxf"])
-
-#     if uploaded_file is not None:
-#         with tempfile.NamedTemporaryFile(delete=False, suffix=".dxf") as tmp_file:
-#             tmp_file.write(uploaded_file.getbuffer())
-#             tmp_filename = tmp_file.name
-
-#         try:
-#             # Load and rotate geometry
-#             geom = Geometry.from_dxf(dxf_filepath=tmp_filename)
-#             geom = geom.rotate_section(angle=-90)  # Clockwise rotation for mullion view
-#             geom.create_mesh(mesh_sizes=[5.0])
-#             sec = Section(geometry=geom)
-#             sec.calculate_geometric_properties()
-
-#             # Get properties for rotated section (-90° rotation swaps axes)
-#             iyy = sec.get_ic()[1]  # This is now the MAJOR axis moment of inertia
-
-#             # Get MAJOR axis moduli (first two values after rotation)
-#             zxx_plus, zxx_minus, zyy_plus, zyy_minus = sec.get_z()  # First 2 values are now major axis
-#             zyy = min(zyy_plus, zyy_minus)  # Conservative value
-
-#             # Update data with converted units
-#             custom_data.update({
-#                 "I": iyy / 1e4,  # mm⁴ → cm⁴ (major axis)
-#                 "Z": zyy / 1e3    # mm³ → cm³ (major axis)
-#             })
-#             # Create landscape plot
-#             fig, ax = plt.subplots(figsize=(10, 5))  # Wider aspect ratio
-#             sec.plot_mesh(materials=False, ax=ax)
-#             ax.set_title(f"Finite Element Mesh Plot of {custom_data['name']} Cross Section")
-#             ax.set_aspect("equal")
-#             ax.set_xlabel("Height")
-#             ax.set_ylabel("Width")
-
-#             st.pyplot(fig)
-#             # Display results
-#             st.write("Structural Properties:")
-#             col1, col2 = st.columns(2)
-#             with col1:
-#                 st.metric("Moment of Inertia (Ixx)", f"{custom_data['I']:.2f} cm⁴")
-#             with col2:
-#                 st.metric("Section Modulus (Zxx)", f"{custom_data['Z']:.2f} cm³")
-#         except Exception as e:
-#             st.error(f"Processing Error: {str(e)}")
-#             st.write("Ensure your DXF:")
-#             st.write("- Contains closed polylines")
-#             st.write("- Has units in millimeters")
-#             st.write("- No 3D elements (Z=0 for all points)")
-
-#         finally:
-#             os.remove(tmp_filename)
-
-#     return custom_data
+# DXF analysis runs in a separate worker process and is killed after this many seconds
+SECTION_TIMEOUT = 30
+_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+_WORKER_LOCK = threading.Lock()
+
+# Each job gets a worker process to itself; up to this many finished workers are kept warm
+# for the next jobs, each with its own parsed DXF cache
+MAX_IDLE_WORKERS = 2
+_IDLE_WORKERS = []
+
+# I and Z are integrated exactly on any mesh of the (polygonal) outline, so a finer mesh only
+# costs time; mesh sizes are raised to keep roughly this many elements at most
+MAX_MESH_ELEMENTS = 50_000
+
+# Parsed DXF geometry kept by each worker, keyed by file digest, so re-meshing a file at
+# another mesh size skips from_dxf; oldest entries are dropped past this many files
+PARSED_DXF_LIMIT = 16
+_PARSED_DXF = {}
+
+# Analysed sections are kept on disk across restarts, least recently used dropped past this
+# size; an entry is a few floats plus the mesh outline (up to ~2 MB for the largest meshes)
+SECTION_CACHE_DIR = os.path.join(tempfile.gettempdir(), "mullion_sections")
+SECTION_CACHE_BYTES = 512 << 20
+
+# DXFs are written to RAM-backed /dev/shm for parsing where it exists, else the default temp dir
+_DXF_TMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK) else None
+
+# Shown under a processing error; static so the error path does no introspection
+TROUBLESHOOTING_STEPS = """Troubleshooting steps:
+1. Verify closed, non-intersecting polylines
+2. Ensure Z=0 for all vertices (FLATTEN in CAD)
+3. Try different mesh size
+4. Check units are millimeters
+"""
+
+# Define default materials. sectionproperties (and with it shapely and matplotlib) is only
+# imported by the DXF worker, so these stay plain properties until _material builds them
+DEFAULT_MATERIALS = {
+    "aluminium": dict(
+        name="Aluminium",
+        elastic_modulus=70e3,
+        poissons_ratio=0.33,
+        density=2.7e-6,
+        yield_strength=160,
+        color="lightgrey",
+    ),
+    "steel": dict(
+        name="Steel",
+        elastic_modulus=210e3,
+        poissons_ratio=0.3,
+        density=7.85e-6,
+        yield_strength=355,
+        color="grey",
+    )
+}
+
+
+def _dxf_digest(uploaded_files):
+    """BLAKE2b digest of the files' contents, read in place through their buffers."""
+    digest = hashlib.blake2b(digest_size=16)
+    for uploaded_file in uploaded_files:
+        with uploaded_file.getbuffer() as buf:
+            # Length prefix so the boundary between files is part of the key
+            digest.update(buf.nbytes.to_bytes(8, "little"))
+            digest.update(buf)
+    return digest.hexdigest()
+
+
+def _bounded_mesh_size(geom, mesh_size):
+    """mesh_size, or the automatic size if None, raised to stay within MAX_MESH_ELEMENTS."""
+    mesh_size = mesh_size or _auto_mesh_size(geom)
+    # Triangle averages somewhat over half the maximum area, hence the factor of 2
+    return max(mesh_size, 2 * geom.geom.area / MAX_MESH_ELEMENTS)
+
+
+def _auto_mesh_size(geom):
+    """Maximum triangle area (mm²) scaled to the section extents, giving a few hundred elements."""
+    # Shapely's bounds are computed in C, unlike calculate_extents which walks the points
+    x_min, y_min, x_max, y_max = geom.geom.bounds
+    extent = max(x_max - x_min, y_max - y_min)
+    return max(1.0, (extent / 80.0) ** 2)
+
+
+def _mesh_size_slider(auto_mesh):
+    """Mesh size chosen by the user, or None to size the mesh from the section extents."""
+    mesh_size = st.slider("Mesh Size", min_value=1.0, max_value=20.0, value=5.0, step=1.0, 
+                          disabled=auto_mesh,
+                          help="Maximum element area (mm²). I and Z are exact on any mesh, "
+                               "so smaller values only give a denser mesh preview and take longer")
+    return None if auto_mesh else mesh_size
+
+
+def _elastic_properties(tri_verts, weights=None):
+    """Elastic centroid, second moment about the vertical axis and elastic modulus of a mesh.
+
+    x and x² are integrated exactly over each straight-sided triangle in one vectorised pass.
+    weights scales each triangle's contribution (modular ratios for a compound section).
+    Returns (cx, cy, Iyy, Zyy) in mm, mm, mm⁴ and mm³, with Zyy taken at the extreme fibre.
+    The per-triangle terms keep tri_verts' dtype but every sum is accumulated in float64;
+    float32 vertices should be centred on the section, see _analyse_section.
+    """
+    edge1 = tri_verts[:, 1] - tri_verts[:, 0]
+    edge2 = tri_verts[:, 2] - tri_verts[:, 0]
+    area = 0.5 * np.abs(edge1[:, 0] * edge2[:, 1] - edge1[:, 1] * edge2[:, 0])
+    if weights is not None:
+        area = area * weights
+    total = area.sum(dtype=np.float64)
+
+    corner_sum = tri_verts.sum(axis=1)  # (M, 2)
+    cx, cy = np.einsum("m,mk->k", area, corner_sum, dtype=np.float64) / (3 * total)
+
+    # ∫x² dA over a triangle = A (x0² + x1² + x2² + (x0 + x1 + x2)²) / 12
+    x = tri_verts[..., 0]
+    iyy = np.einsum("m,m->", area, (x * x).sum(axis=1) + corner_sum[:, 0] ** 2,
+                    dtype=np.float64) / 12 - total * cx * cx
+    extreme_fibre = max(x.max() - cx, cx - x.min())
+    return cx, cy, iyy, iyy / extreme_fibre
+
+
+def _mesh_edges(tri_verts):
+    """x and y coordinates tracing every triangle's outline, NaN-separated for one line trace."""
+    # Each triangle is closed back to its first corner, then a NaN breaks the line
+    loops = np.concatenate([tri_verts, tri_verts[:, :1], np.full((len(tri_verts), 1, 2), np.nan, tri_verts.dtype)], axis=1)
+    loops = loops.astype(np.float32, copy=False).reshape(-1, 2)
+    return loops[:, 0], loops[:, 1]
+
+
+def _mesh_figure(section, name):
+    """WebGL plot of the mesh triangles with the elastic centroid marked.
+
+    The browser draws the mesh from the edge coordinates, so nothing is rasterised server-side.
+    """
+    cx, cy = section["centroid"]
+    fig = go.Figure(
+        data=[
+            go.Scattergl(x=section["mesh_x"], y=section["mesh_y"], mode="lines",
+                         line=dict(color="black", width=0.5), hoverinfo="skip", name="Mesh"),
+            go.Scattergl(x=[cx], y=[cy], mode="markers",  # Elastic centroid
+                         marker=dict(color="red", symbol="cross-thin-open", size=12), name="Centroid"),
+        ],
+        layout=dict(
+            title=f"Finite Element Mesh Plot of {name} Cross Section",
+            # Swap x and y labels to reflect rotated orientation
+            xaxis=dict(title="Height"),
+            yaxis=dict(title="Width", scaleanchor="x", scaleratio=1),
+            showlegend=False,
+            plot_bgcolor="white",
+            height=400,
+        ),
+    )
+    return fig
+
+
+@functools.lru_cache(maxsize=None)
+def _material(name):
+    """sectionproperties Material for a DEFAULT_MATERIALS key, built once per process."""
+    from sectionproperties.pre import Material
+
+    return Material(**DEFAULT_MATERIALS[name])
+
+
+def _parse_dxf(contents, digest):
+    """Geometry of a DXF file from its contents, parsed once per digest.
+
+    Returns a shallow copy, so callers can assign a material without touching the cached
+    geometry; rotating and meshing already return new objects.
+    """
+    import cad_to_shapely  # noqa: F401  Puts its own directory on sys.path, see below
+    from sectionproperties.pre.geometry import Geometry
+    # cad_to_shapely imports its modules top-level, so its importer raises this class rather
+    # than cad_to_shapely.cadimporter.CadImporterError
+    from cadimporter import CadImporterError
+
+    geom = _PARSED_DXF.pop(digest, None)
+    if geom is None:
+        # cad_to_shapely only reads DXFs from a path, so a file is written on a cache miss only
+        with tempfile.TemporaryDirectory(dir=_DXF_TMP_DIR) as tmp_dir:
+            path = os.path.join(tmp_dir, "section.dxf")
+            with open(path, "wb") as f:
+                f.write(contents)
+            try:
+                geom = Geometry.from_dxf(dxf_filepath=path)
+            except (RuntimeError, CadImporterError):
+                # Raised when no closed loop can be formed, or the DXF has no entities that can
+                # be polygonised; the message would show the temp path or importer internals
+                raise ValueError("No closed, non-intersecting outline found in the DXF") from None
+    _PARSED_DXF[digest] = geom  # Most recently used last
+    if len(_PARSED_DXF) > PARSED_DXF_LIMIT:
+        del _PARSED_DXF[next(iter(_PARSED_DXF))]
+    return copy.copy(geom)
+
+
+def _analyse_section(main_dxf, main_material, reinforcements, ref_material, mesh_size):
+    """Mesh the DXF file(s) and return the major axis I (mm⁴), Z (mm³) and the mesh outline.
+
+    main_dxf is a (DXF contents, digest) pair and reinforcements a tuple of (DXF contents,
+    digest, material) triples. A mesh_size of None sizes the
+    mesh from the section extents. Runs in the worker process, see _run_in_worker.
+    """
+    from sectionproperties.pre.geometry import CompoundGeometry
+
+    # Handle different geometry types based on reinforcement flag
+    if reinforcements:
+        # === COMPOUND SECTION WITH REINFORCEMENT ===
+        # Create main geometry with selected material
+        main_geom = _parse_dxf(*main_dxf)
+        main_geom.material = _material(main_material)
+
+        # Initialize compound geometry with main section
+        compound_geom = CompoundGeometry([main_geom])
+
+        # Add reinforcement sections if any
+        for reinf_contents, reinf_digest, reinf_mat in reinforcements:
+            reinf_geom = _parse_dxf(reinf_contents, reinf_digest)
+            reinf_geom.material = _material(reinf_mat)
+
+            # Add to compound geometry
+            compound_geom += reinf_geom
+
+        # Rotate compound geometry 90 degrees clockwise for mullion view
+        compound_geom = compound_geom.rotate_section(angle=-90)
+
+        # Create mesh with specified size
+        mesh_size = _bounded_mesh_size(compound_geom, mesh_size)
+        compound_geom.create_mesh(mesh_sizes=mesh_size)
+        mesh = compound_geom.mesh
+
+        # === COMPOUND SECTION PROPERTIES ===
+        # Weight each triangle by its material's modular ratio to the reference
+        # material, giving transformed section properties
+        ref_modulus = DEFAULT_MATERIALS[ref_material]["elastic_modulus"]
+        region_ratios = np.array([g.material.elastic_modulus for g in compound_geom.geoms]) / ref_modulus
+        weights = region_ratios[mesh["triangle_attributes"][:, 0].astype(int)].astype(np.float32)
+
+    else:
+        # === SINGLE SECTION WITHOUT REINFORCEMENT ===
+        # Load and rotate geometry
+        geom = _parse_dxf(*main_dxf)
+        geom = geom.rotate_section(angle=-90)  # Clockwise rotation for mullion view
+        mesh_size = _bounded_mesh_size(geom, mesh_size)
+        geom.create_mesh(mesh_sizes=mesh_size)
+        mesh = geom.mesh
+        weights = None
+
+    # Corner nodes of every triangle, (M, 3, 2); the mid-side nodes add nothing for
+    # straight-sided elements. int32 connectivity and float32 coordinates halve the
+    # arrays' footprint. The vertices are centred in float64 first: float32 keeps only ~7
+    # significant digits, so x² on raw CAD coordinates far from the origin would lose I
+    # (relative errors of 1e-4 to 1e-3 at offsets of metres). Centred, I is within ~1e-7
+    origin = mesh["vertices"].mean(axis=0)
+    triangles = np.ascontiguousarray(mesh["triangles"][:, :3], dtype=np.int32)
+    tri_verts = (mesh["vertices"] - origin).astype(np.float32)[triangles]
+
+    # After the -90° rotation the major axis is the vertical (y) axis
+    cx, cy, iyy, section_modulus = _elastic_properties(tri_verts, weights)
+
+    # The outline is plotted in the DXF's own coordinates
+    mesh_x, mesh_y = _mesh_edges(tri_verts)
+    mesh_x += np.float32(origin[0])
+    mesh_y += np.float32(origin[1])
+    return {"I": iyy, "Z": section_modulus, "centroid": (float(cx + origin[0]), float(cy + origin[1])),
+            "mesh_x": mesh_x, "mesh_y": mesh_y, "mesh_size": float(mesh_size), "elements": len(triangles)}
+
+
+def _worker_loop(conn):
+    """Worker process main loop: run each (func, args) received, reply with (ok, result)."""
+    while True:
+        try:
+            func, args = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, func(*args)))
+        except Exception as e:
+            try:
+                conn.send((False, e))
+            except Exception:
+                # The exception itself couldn't be pickled
+                conn.send((False, RuntimeError(str(e))))
+
+
+def _start_worker():
+    """Start a new worker process; returns its (process, connection) pair."""
+    context = multiprocessing.get_context(_START_METHOD)
+    if _START_METHOD == "forkserver":
+        # Workers fork from a server that has already imported this module and
+        # sectionproperties, so a new worker starts warm
+        context.set_forkserver_preload([__name__, "sectionproperties.pre.geometry"])
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+    # Streamlit installs the app script as __main__, and multiprocessing re-runs __main__'s
+    # file in every forkserver/spawn child, which would run the whole app in the worker.
+    # The worker only needs this module, so it starts under a bare stand-in __main__
+    with _WORKER_LOCK:
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            process.start()
+        finally:
+            sys.modules["__main__"] = main_module
+    child_conn.close()
+    return process, conn
+
+
+def _acquire_worker():
+    """An idle worker for one job's exclusive use, or a new one if none is idle."""
+    with _WORKER_LOCK:
+        while _IDLE_WORKERS:
+            worker = _IDLE_WORKERS.pop()
+            if worker[0].is_alive():
+                return worker
+    return _start_worker()
+
+
+def _stop_worker(worker):
+    """Kill a worker process, whatever it is doing."""
+    process, conn = worker
+    process.kill()
+    process.join()
+    conn.close()
+
+
+def _release_worker(worker):
+    """Return a worker whose job finished to the idle list, or stop it if the list is full."""
+    with _WORKER_LOCK:
+        if len(_IDLE_WORKERS) < MAX_IDLE_WORKERS:
+            _IDLE_WORKERS.append(worker)
+            return
+    _stop_worker(worker)
+
+
+def _worker_ready():
+    """Import sectionproperties in the worker if it hasn't been already."""
+    import sectionproperties.pre.geometry  # noqa: F401
+
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def warm_up_dxf_worker():
+    """Start the DXF worker in the background once per server, at app start-up.
+
+    The first upload then doesn't wait for the worker process and its sectionproperties
+    imports.
+    """
+    threading.Thread(target=_run_in_worker, args=(_worker_ready,), daemon=True).start()
+
+
+def _run_in_worker(func, *args):
+    """Call func(*args) in a worker process, killing it after SECTION_TIMEOUT seconds.
+
+    Pathological DXFs can keep from_dxf or the mesher busy for minutes; running them out of
+    process stops one upload from freezing the Streamlit server for every session. Each job
+    has its worker to itself, so the timeout never counts time queued behind another
+    session's job and killing the worker only aborts this one.
+    """
+    worker = _acquire_worker()
+    process, conn = worker
+    try:
+        conn.send((func, args))
+        if not conn.poll(SECTION_TIMEOUT):
+            raise TimeoutError(f"DXF too complex, aborted after {SECTION_TIMEOUT} s")
+        ok, result = conn.recv()
+    except EOFError:
+        _stop_worker(worker)
+        raise RuntimeError("The DXF worker process stopped unexpectedly") from None
+    except BaseException:
+        # Timed out or the script run was interrupted: the job may still be running
+        _stop_worker(worker)
+        raise
+    _release_worker(worker)
+    if not ok:
+        raise result
+    return result
+
+
+@st.cache_resource(show_spinner=False)
+def _section_disk_cache():
+    """On-disk cache of analysed sections shared by the server's sessions and restarts.
+
+    Least recently used entries are evicted once it outgrows SECTION_CACHE_BYTES.
+    """
+    import diskcache
+
+    return diskcache.Cache(SECTION_CACHE_DIR, size_limit=SECTION_CACHE_BYTES,
+                           eviction_policy="least-recently-used")
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _compute_section(dxf_key, _main_file, main_material, _reinf_files, reinf_materials,
+                     ref_material, mesh_size):
+    """Section properties and mesh outline for the uploaded DXF(s), see _analyse_section.
+
+    The uploaded files are left out of st.cache_data's hashing (leading underscore); dxf_key,
+    their _dxf_digest, stands in for them, so reruns that only change the name or depth skip
+    the meshing without rehashing every file. Misses in memory fall back to a size-limited
+    disk cache, so a previously analysed DXF stays cached across server restarts.
+    """
+    disk_cache = _section_disk_cache()
+    key = (dxf_key, main_material, reinf_materials, ref_material, mesh_size)
+    result = disk_cache.get(key)
+    if result is not None:
+        return result
+
+    # The contents go to the worker in memory; it only writes a DXF it hasn't parsed before
+    reinforcements = tuple(
+        (reinf_file.getvalue(), _dxf_digest([reinf_file]), reinf_mat)
+        for reinf_file, reinf_mat in zip(_reinf_files, reinf_materials)
+    )
+    result = _run_in_worker(
+        _analyse_section, (_main_file.getvalue(), _dxf_digest([_main_file])), main_material,
+        reinforcements, ref_material, mesh_size
+    )
+    disk_cache.set(key, result)
+    return result
+
 
 def get_custom_profile():
     """Process DXF with proper 90° rotation for mullion visualization and compound geometry support"""
-    from sectionproperties.pre import Material
-    from sectionproperties.pre.geometry import Geometry, CompoundGeometry
-    
     custom_data = {
         "type": "dxf",
         "name": "DXF Profile",
@@ -96,229 +441,140 @@ def get_custom_profile():
         "I": 1.0
     }
     
-    # Define default materials
-    DEFAULT_MATERIALS = {
-        "aluminium": Material(
-            name="Aluminium",
-            elastic_modulus=70e3,
-            poissons_ratio=0.33,
-            density=2.7e-6,
-            yield_strength=160,
-            color="lightgrey",
-        ),
-        "steel": Material(
-            name="Steel",
-            elastic_modulus=210e3,
-            poissons_ratio=0.3,
-            density=7.85e-6,
-            yield_strength=355,
-            color="grey",
-        )
-    }
-    
-    # Input row at top
+    # Options that change the layout sit outside the form so they apply immediately
     col1, col2 = st.columns(2)
     with col1:
-        custom_data["name"] = st.text_input("Profile Name", value="DXF Profile")
+        # Add reinforcement option
+        add_reinforcement = st.checkbox("Add Reinforcement Sections", value=False)
     with col2:
-        custom_data["depth"] = st.number_input("Section Depth (mm)", 
-                                             min_value=50.0, max_value=500.0, 
-                                             value=150.0, step=1.0)
-    
+        auto_mesh = st.checkbox("Automatic Mesh Size", value=True,
+                                help="Scale the mesh to the section so large profiles stay fast")
+
     # Main section upload
     st.subheader("Main Section")
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        uploaded_file = st.file_uploader("Upload Main DXF File", type=["dxf"], key="main_dxf")
-    with col2:
-        main_material = st.selectbox(
-            "Material",
-            options=list(DEFAULT_MATERIALS.keys()),
-            index=0,
-            key="main_material"
-        )
-    
-    # Add reinforcement option
-    add_reinforcement = st.checkbox("Add Reinforcement Sections", value=False)
-    
-    # Initialize for reinforcement sections
+    uploaded_file = st.file_uploader("Upload Main DXF File", type=["dxf"], key="main_dxf")
+
+    # One uploader takes any number of reinforcement sections; it sits outside the form
+    # because each file gets its own material select below
     reinforcement_files = []
-    reinforcement_materials = []
-    
-    # Show reinforcement upload options if checkbox is selected
     if add_reinforcement:
         st.subheader("Reinforcement Sections")
+        reinforcement_files = st.file_uploader("Upload Reinforcement DXF Files", type=["dxf"],
+                                               accept_multiple_files=True, key="reinf_dxf") or []
+
+    # Everything else is submitted together, so typing a name or picking a material doesn't
+    # rerun the app until "Compute Section" is pressed
+    with st.form("dxf_profile"):
+        # Input row at top
+        col1, col2 = st.columns(2)
+        with col1:
+            custom_data["name"] = st.text_input("Profile Name", value="DXF Profile")
+        with col2:
+            custom_data["depth"] = st.number_input("Section Depth (mm)", 
+                                                 min_value=50.0, max_value=500.0, 
+                                                 value=150.0, step=1.0)
         
-        # Use headings and horizontal rules to separate sections
-        for i in range(5):
-            st.markdown(f"#### Reinforcement #{i+1}")
-            
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                reinf_file = st.file_uploader(f"Upload Reinforcement DXF #{i+1}", 
-                                           type=["dxf"], 
-                                           key=f"reinf_dxf_{i}")
-            with col2:
-                reinf_material = st.selectbox(
-                    "Material",
-                    options=list(DEFAULT_MATERIALS.keys()),
-                    index=1 if "steel" in DEFAULT_MATERIALS else 0,
-                    key=f"reinf_material_{i}"
-                )
-            
-            if reinf_file is not None:
-                reinforcement_files.append(reinf_file)
-                reinforcement_materials.append(reinf_material)
-            
-            # Add a separator between reinforcement sections
-            if i < 4:  # Don't show after the last one
-                st.markdown("---")
-    
-    # Reference material for transformed properties (only shown if reinforcement is added)
-    if add_reinforcement:
-        st.subheader("Analysis Settings")
+        # Materials for the main section and each uploaded reinforcement
+        st.subheader("Materials")
         col1, col2 = st.columns(2)
         with col1:
-            ref_material = st.selectbox(
-                "Reference Material for Transformed Properties",
+            main_material = st.selectbox(
+                "Main Section",
                 options=list(DEFAULT_MATERIALS.keys()),
-                index=0
+                index=0,
+                key="main_material"
             )
-        with col2:
-            mesh_size = st.slider("Mesh Size", min_value=1.0, max_value=20.0, value=5.0, step=1.0, 
-                                help="Smaller values = finer mesh (slower but more accurate)")
-    else:
-        # Still need mesh size for single section
+        
+        reinforcement_materials = []
+        for i, reinf_file in enumerate(reinforcement_files):
+            with (col2 if i % 2 == 0 else col1):
+                reinforcement_materials.append(st.selectbox(
+                    reinf_file.name,
+                    options=list(DEFAULT_MATERIALS.keys()),
+                    index=1 if "steel" in DEFAULT_MATERIALS else 0,
+                    key=f"reinf_material_{reinf_file.file_id}"
+                ))
+        
+        # Reference material for transformed properties (only shown if reinforcement is added)
         st.subheader("Analysis Settings")
-        mesh_size = st.slider("Mesh Size", min_value=1.0, max_value=20.0, value=5.0, step=1.0, 
-                            help="Smaller values = finer mesh (slower but more accurate)")
-        # Default reference material (not used but needed for variable scope)
-        ref_material = main_material
+        if add_reinforcement:
+            col1, col2 = st.columns(2)
+            with col1:
+                ref_material = st.selectbox(
+                    "Reference Material for Transformed Properties",
+                    options=list(DEFAULT_MATERIALS.keys()),
+                    index=0
+                )
+            with col2:
+                mesh_size = _mesh_size_slider(auto_mesh)
+        else:
+            # Still need mesh size for single section
+            mesh_size = _mesh_size_slider(auto_mesh)
+            # Default reference material (not used but needed for variable scope)
+            ref_material = main_material
+
+        submitted = st.form_submit_button("Compute Section")
     
-    # Only proceed if main file is uploaded
-    if uploaded_file is not None:
-        try:
-            # Create temporary directory to store all files
-            with tempfile.TemporaryDirectory() as tmp_dir:
-                # Save main DXF to temp file
-                main_tmp_path = os.path.join(tmp_dir, "main.dxf")
-                with open(main_tmp_path, 'wb') as f:
-                    f.write(uploaded_file.getbuffer())
-                
-                # Handle different geometry types based on reinforcement flag
-                if add_reinforcement and reinforcement_files:
-                    # === COMPOUND SECTION WITH REINFORCEMENT ===
-                    # Create main geometry with selected material
-                    main_geom = Geometry.from_dxf(dxf_filepath=main_tmp_path)
-                    main_geom.material = DEFAULT_MATERIALS[main_material]
-                    
-                    # Initialize compound geometry with main section
-                    compound_geom = CompoundGeometry([main_geom])
-                    
-                    # Add reinforcement sections if any
-                    for i, (reinf_file, reinf_mat) in enumerate(zip(reinforcement_files, reinforcement_materials)):
-                        reinf_tmp_path = os.path.join(tmp_dir, f"reinf_{i}.dxf")
-                        with open(reinf_tmp_path, 'wb') as f:
-                            f.write(reinf_file.getbuffer())
-                        
-                        reinf_geom = Geometry.from_dxf(dxf_filepath=reinf_tmp_path)
-                        reinf_geom.material = DEFAULT_MATERIALS[reinf_mat]
-                        
-                        # Add to compound geometry
-                        compound_geom += reinf_geom
-                    
-                    # Get reference material object
-                    ref_material_obj = DEFAULT_MATERIALS[ref_material]
-                    
-                    # Rotate compound geometry 90 degrees clockwise for mullion view
-                    compound_geom = compound_geom.rotate_section(angle=-90)
-                    
-                    # Create mesh with specified size
-                    compound_geom.create_mesh(mesh_sizes=mesh_size)
-                    
-                    # Create section and calculate properties
-                    sec = Section(geometry=compound_geom)
-                    sec.calculate_geometric_properties()
-                    sec.calculate_plastic_properties()
-                    
-                    # === COMPOUND SECTION PROPERTIES ===
-                    # Get transformed properties using reference material's elastic modulus
-                    # After 90° rotation, what was Iyy is now the major axis (Ixx)
-                    ixx, iyy, ixy = sec.get_eic(e_ref=ref_material_obj)
-                    
-                    # Get elastic moduli with reference material
-                    try:
-                        # After rotation, zxx values are now major axis
-                        zxx_plus, zxx_minus, zyy_plus, zyy_minus = sec.get_ez(e_ref=ref_material_obj)
-                        section_modulus = min(zyy_plus, zyy_minus)  # Conservative value
-                    except (ValueError, TypeError) as e:
-                        st.warning(f"Could not calculate section moduli: {str(e)}")
-                        section_modulus = 0
-                    
-                    # Display material information
-                    material_info = f"Main: {main_material.capitalize()}"
+    # Digest of the files currently uploaded, which any result shown must have been computed from
+    dxf_key = _dxf_digest([uploaded_file, *reinforcement_files]) if uploaded_file is not None else None
+
+    # Analyse on submit and keep the result for the reruns in between
+    if submitted:
+        previous = st.session_state.pop("dxf_section", None)
+        # Only proceed if main file is uploaded
+        if uploaded_file is not None:
+            inputs = (dxf_key, main_material, tuple(reinforcement_materials), ref_material, mesh_size)
+            if previous is not None and previous["inputs"] == inputs:
+                # Resubmitting unchanged inputs keeps the result already held for this
+                # session rather than fetching (and unpickling) it from the cache again
+                st.session_state["dxf_section"] = previous
+            else:
+                try:
+                    result = _compute_section(
+                        inputs[0], uploaded_file, main_material, reinforcement_files,
+                        tuple(reinforcement_materials), ref_material, mesh_size
+                    )
+                    material_info = None
                     if reinforcement_files:
-                        material_info += f", Reinforcements: {', '.join(m.capitalize() for m in set(reinforcement_materials))}"
-                    st.write(f"Reference Material: {ref_material.capitalize()}")
-                    st.write(material_info)
-                    
-                else:
-                    # === SINGLE SECTION WITHOUT REINFORCEMENT ===
-                    # Load and rotate geometry
-                    geom = Geometry.from_dxf(dxf_filepath=main_tmp_path)
-                    geom = geom.rotate_section(angle=-90)  # Clockwise rotation for mullion view
-                    geom.create_mesh(mesh_sizes=mesh_size)
-                    sec = Section(geometry=geom)
-                    sec.calculate_geometric_properties()
-                    
-                    # === STANDARD SECTION PROPERTIES ===
-                    # Get properties for rotated section (-90° rotation swaps axes)
-                    ixx, iyy, ixy = sec.get_ic()  # Standard moment of inertia calculation
-                    
-                    # Get standard section moduli
-                    zxx_plus, zxx_minus, zyy_plus, zyy_minus = sec.get_z()
-                    section_modulus = min(zyy_plus, zyy_minus)  # Conservative value
-                
-                # Update data with converted units (mm⁴ → cm⁴, mm³ → cm³)
-                custom_data.update({
-                    "I": iyy / 1e4,  # mm⁴ → cm⁴ (major axis after rotation)
-                    "Z": section_modulus / 1e3  # mm³ → cm³ (major axis after rotation)
-                })
-                
-                # Create landscape plot with adjusted axes
-                fig, ax = plt.subplots(figsize=(10, 5))  # Wider aspect ratio
-                
-                # Plot the mesh
-                sec.plot_centroids(ax=ax)
-                
-                # Modify plot to match rotated view
-                ax.set_title(f"Finite Element Mesh Plot of {custom_data['name']} Cross Section")
-                ax.set_aspect("equal")
-                
-                # Swap x and y labels to reflect rotated orientation
-                ax.set_xlabel("Height")
-                ax.set_ylabel("Width")
-                
-                # Optional: Adjust axis limits if needed
-                # ax.invert_xaxis()  # Uncomment if you need to flip the x-axis
-                
-                st.pyplot(fig)
-                
-                # Display results
-                st.write("**Structural Properties:**")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("Moment of Inertia (Ixx)", f"{custom_data['I']:.2f} cm⁴")
-                with col2:
-                    st.metric("Section Modulus (Zxx)", f"{custom_data['Z']:.2f} cm³")
-                
-        except Exception as e:
-            st.error(f"Processing Error: {str(e)}")
-            st.write("Troubleshooting steps:")
-            st.write("1. Verify closed, non-intersecting polylines")
-            st.write("2. Ensure Z=0 for all vertices (FLATTEN in CAD)")
-            st.write("3. Try different mesh size")
-            st.write("4. Check units are millimeters")
-            st.write("5. Check exception details:", str(e))
+                        # Display material information
+                        material_info = (
+                            f"Reference Material: {ref_material.capitalize()}",
+                            f"Main: {main_material.capitalize()}, Reinforcements: "
+                            f"{', '.join(m.capitalize() for m in set(reinforcement_materials))}",
+                        )
+                    st.session_state["dxf_section"] = {**result, "material_info": material_info,
+                                                       "inputs": inputs}
+                except Exception as e:
+                    st.error(f"Processing Error: {str(e)}")
+                    st.markdown(TROUBLESHOOTING_STEPS)
+
+    section = st.session_state.get("dxf_section")
+    if section is not None and section["inputs"][0] != dxf_key:
+        # The files were removed or replaced without recomputing, so the stored result no
+        # longer describes them; drop it rather than showing and returning the old section
+        del st.session_state["dxf_section"]
+        section = None
+    if section is not None:
+        if section["material_info"]:
+            for line in section["material_info"]:
+                st.write(line)
+
+        # Update data with converted units (mm⁴ → cm⁴, mm³ → cm³)
+        custom_data.update({
+            "I": section["I"] / 1e4,  # mm⁴ → cm⁴ (major axis after rotation)
+            "Z": section["Z"] / 1e3  # mm³ → cm³ (major axis after rotation)
+        })
+
+        # The mesh outline is cached with the section, so the figure is built here to follow name edits
+        st.plotly_chart(_mesh_figure(section, custom_data["name"]), use_container_width=True)
+        st.caption(f"{section['elements']:,} elements, max element area {section['mesh_size']:.3g} mm²")
+        
+        # Display results
+        st.write("**Structural Properties:**")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Moment of Inertia (Ixx)", f"{custom_data['I']:.2f} cm⁴")
+        with col2:
+            st.metric("Section Modulus (Zxx)", f"{custom_data['Z']:.2f} cm³")
     
     return custom_data
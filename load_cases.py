@@ -1,7 +1,10 @@
 from config import material_props, BARRIER_LENGTH
+from calc import ULS_FACTORS, deflection_limit, required_inertia
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+@st.cache_data(show_spinner=False)
 def generate_load_case_tables(wind_pressure, bay_width, mullion_length, selected_barrier_load):
     """
     Generate dataframes for ULS and SLS load cases.
@@ -32,86 +35,39 @@ def generate_load_case_tables(wind_pressure, bay_width, mullion_length, selected
     M_WL = (w * L**2) / 8
     M_BL = ((selected_barrier_load * bay) * BARRIER_LENGTH) / 2
     
-    # ULS calculations
-    uls_data = []
-    
-    # ULS 1: 1.5 WL + 0.75 BL
-    M_ULS1 = 1.5 * M_WL + 0.75 * M_BL
-    Z_req1 = M_ULS1 / material_props["Aluminium"]["fy"]  # Using Aluminium as default for calculation
-    Z_req1_cm3 = Z_req1 / 1000  # Convert to cm³
-    uls_data.append({
-        "Load Case": "ULS 1",
-        "Loading": f"1.5 WL + 0.75 BL",
-        "Required Z (cm³)": f"{Z_req1_cm3:.2f}"
-    })
-    
-    # ULS 2: 0.75 WL + 1.5 BL
-    M_ULS2 = 0.75 * M_WL + 1.5 * M_BL
-    Z_req2 = M_ULS2 / material_props["Aluminium"]["fy"]
-    Z_req2_cm3 = Z_req2 / 1000
-    uls_data.append({
-        "Load Case": "ULS 2",
-        "Loading": f"0.75 WL + 1.5 BL",
-        "Required Z (cm³)": f"{Z_req2_cm3:.2f}"
-    })
-    
-    # ULS 3: 1.5 WL
-    M_ULS3 = 1.5 * M_WL
-    Z_req3 = M_ULS3 / material_props["Aluminium"]["fy"]
-    Z_req3_cm3 = Z_req3 / 1000
-    uls_data.append({
-        "Load Case": "ULS 3",
-        "Loading": f"1.5 WL",
-        "Required Z (cm³)": f"{Z_req3_cm3:.2f}"
-    })
-    
-    # ULS 4: 1.5 BL
-    M_ULS4 = 1.5 * M_BL
-    Z_req4 = M_ULS4 / material_props["Aluminium"]["fy"]
-    Z_req4_cm3 = Z_req4 / 1000
-    uls_data.append({
-        "Load Case": "ULS 4",
-        "Loading": f"1.5 BL",
-        "Required Z (cm³)": f"{Z_req4_cm3:.2f}"
-    })
+    # ULS calculations: every combination's moment from one (4, 2) @ (2,) product
+    fy = material_props["Aluminium"]["fy"]  # Using Aluminium as default for calculation
+    factors = np.array(list(ULS_FACTORS.values()))
+    Z_req_cm3 = factors @ (M_WL, M_BL) / fy / 1000  # Convert to cm³
     
     # Create ULS dataframe
-    uls_df = pd.DataFrame(uls_data)
+    uls_df = pd.DataFrame({
+        "Load Case": list(ULS_FACTORS),
+        "Loading": [" + ".join(f"{f:g} {load}" for f, load in zip(case, ("WL", "BL")) if f)
+                    for case in ULS_FACTORS.values()],
+        "Required Z (cm³)": Z_req_cm3
+    })
     
     # SLS calculations
-    sls_data = []
-    
     # Deflection limit based on mullion length
-    if L <= 3000:
-        defl_limit = L / 200
-    elif L < 7500:
-        defl_limit = 5 + L / 300
-    else:
-        defl_limit = L / 250
+    defl_limit = deflection_limit(L)
     
     E = material_props["Aluminium"]["E"]  # Using Aluminium as default
     
-    # SLS 1: Wind Load
-    I_req_wl = (5 * w * L**4) / (384 * E * defl_limit)
-    I_req_wl_cm4 = I_req_wl / 10000  # Convert from mm⁴ to cm⁴
-    sls_data.append({
-        "Load Case": "SLS 1",
-        "Loading": "Wind Load",
-        "Required I (cm⁴)": f"{I_req_wl_cm4:.2f}"
-    })
-    
-    # SLS 2: Barrier Load
-    F_BL = selected_barrier_load * bay
-    I_req_bl = ((F_BL * BARRIER_LENGTH) / (12 * E * defl_limit)) * (0.75 * L**2 - BARRIER_LENGTH**2)
-    I_req_bl_cm4 = I_req_bl / 10000  # Convert from mm⁴ to cm⁴
-    sls_data.append({
-        "Load Case": "SLS 2",
-        "Loading": "Barrier Load",
-        "Required I (cm⁴)": f"{I_req_bl_cm4:.2f}"
-    })
+    # SLS 1: Wind Load, SLS 2: Barrier Load, from the same deflection formulas as the checks
+    sls_cases = ["SLS 1", "SLS 2"]
+    I_req = np.array([
+        required_inertia(case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E, defl_limit)
+        for case in sls_cases
+    ])
+    I_req_cm4 = I_req / 10000  # Convert from mm⁴ to cm⁴
     
     # Create SLS dataframe
-    sls_df = pd.DataFrame(sls_data)
+    sls_df = pd.DataFrame({
+        "Load Case": sls_cases,
+        "Loading": ["Wind Load", "Barrier Load"],
+        "Required I (cm⁴)": I_req_cm4
+    })
     
     return uls_df, sls_df
 
@@ -135,8 +91,9 @@ def display_load_case_tables(wind_pressure, bay_width, mullion_length, selected_
         wind_pressure, bay_width, mullion_length, selected_barrier_load
     )
     
+    # The requirements are stored as floats and only formatted for display
     st.subheader("Ultimate Limit State (ULS) Load Cases")
-    st.dataframe(uls_df)
+    st.dataframe(uls_df, column_config={"Required Z (cm³)": st.column_config.NumberColumn(format="%.2f")})
     
     st.subheader("Serviceability Limit State (SLS) Load Cases")
-    st.dataframe(sls_df)
+    st.dataframe(sls_df, column_config={"Required I (cm⁴)": st.column_config.NumberColumn(format="%.2f")})
@@ -1,16 +1,13 @@
 import streamlit as st
 import os
 import pandas as pd
-import io
 
 from auth import authenticate_user
 from config import set_page_config, material_props
 from calc import generate_plots, generate_section_database
 from pdf_export import get_pdf_bytes, generate_pdf_download_button
 from documentation import render_documentation
-from custom_profile import get_custom_profile
-import matplotlib.pyplot as plt
-from sectionproperties.analysis.section import Section
+from custom_profile import get_custom_profile, warm_up_dxf_worker
 from load_cases import display_load_case_tables
 
 # ---------------------------
@@ -18,6 +15,7 @@ from load_cases import display_load_case_tables
 # ---------------------------
 authenticate_user()
 set_page_config()
+warm_up_dxf_worker()
 
 st.title("Mullion Design Widget - *Beta Version*")
 st.markdown("Find your one in a mullion ❤️")
@@ -28,18 +26,39 @@ st.markdown("Find your one in a mullion ❤️")
 st.sidebar.header("Inputs")
 plot_material = st.sidebar.selectbox("Select Material", options=["Aluminium", "Steel"], index=0)
 
+selected_columns = ["Supplier", "Profile Name", "Material", "Reinf", "Depth", "Iyy", "Wyy"]
+
+
+@st.cache_data(show_spinner=False)
+def load_section_database(path, sheet):
+    """Selected columns of one sheet of the section database, parsed once per sheet.
+
+    Each sheet is also saved as Parquet next to the workbook, so later server starts skip the
+    workbook parse. The copy is rebuilt whenever the workbook is newer.
+    """
+    parquet_path = f"{os.path.splitext(path)[0]} - {sheet}.parquet"
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(path):
+        return pd.read_parquet(parquet_path, columns=selected_columns)
+
+    # Skipping the units row lets the reader type the numeric columns itself
+    df = pd.read_excel(path, sheet_name=sheet, engine="calamine", usecols=selected_columns, skiprows=[1])
+    try:
+        df.to_parquet(f"{parquet_path}.tmp", index=False)
+        os.replace(f"{parquet_path}.tmp", parquet_path)
+    except Exception:
+        pass  # Read-only deployments just parse the workbook once per server
+    return df
+
+
 # Read the Excel file (using a relative path)
 file_path = "data/Cross_Sections_Database.xlsx"
 SHEET = "Alu Mullion Database" if plot_material == "Aluminium" else "Steel Mullion Database"
 try:
-    df = pd.read_excel(file_path, sheet_name=SHEET, engine="openpyxl")
+    df_selected = load_section_database(file_path, SHEET)
 except Exception as e:
     st.error(f"Error reading Excel file: {e}")
     st.stop()
 
-selected_columns = ["Supplier", "Profile Name", "Material", "Reinf", "Depth", "Iyy", "Wyy"]
-df_selected = df[selected_columns].iloc[1:].reset_index(drop=True)
-
 # Sidebar: Calculation Parameters
 selected_suppliers = st.sidebar.multiselect(
     "Select Suppliers",
@@ -88,33 +107,44 @@ with st.sidebar.expander("About this Tool"):
     """)
 
 # In main.py
-with st.expander("Custom Profile?", expanded=False):
-    custom_option = st.selectbox(
-        "Select Custom Profile Option", 
-        ["None", "Manual Input", "Import DXF"]
-    )
-    
-    custom_section_data = {}
-    
-    if custom_option == "Manual Input":
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            name = st.text_input("Profile Name", value="Custom Profile")
-        with col2:
-            depth = st.number_input("Section Depth (mm)", min_value=50.0, max_value=500.0, value=150.0, step=1.0)
-        with col3:
-            Z = st.number_input("Z (cm³)", min_value=1.0, max_value=1000.0, value=50.0, step=1.0)
-        with col4:
-            I = st.number_input("Moment of Inertia (cm⁴)", min_value=1.0, max_value=10000.0, value=500.0, step=1.0)
-        custom_section_data = {"type": "manual", "name": name, "depth": depth, "Z": Z, "I": I}
-    
-    elif custom_option == "Import DXF":
-        # Import the function from your custom_profile.py
-        from custom_profile import get_custom_profile
+# Reruns triggered from inside the expander (uploads, checkboxes, form edits) only redraw
+# the expander. The app is rerun only when they change the section data it returns
+@st.fragment
+def custom_profile_input():
+    with st.expander("Custom Profile?", expanded=False):
+        custom_option = st.selectbox(
+            "Select Custom Profile Option", 
+            ["None", "Manual Input", "Import DXF"]
+        )
+        
+        custom_section_data = {}
         
-        # Call the function which now handles compound sections internally
-        custom_section_data = get_custom_profile()
+        if custom_option == "Manual Input":
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                name = st.text_input("Profile Name", value="Custom Profile")
+            with col2:
+                depth = st.number_input("Section Depth (mm)", min_value=50.0, max_value=500.0, value=150.0, step=1.0)
+            with col3:
+                Z = st.number_input("Z (cm³)", min_value=1.0, max_value=1000.0, value=50.0, step=1.0)
+            with col4:
+                I = st.number_input("Moment of Inertia (cm⁴)", min_value=1.0, max_value=10000.0, value=500.0, step=1.0)
+            custom_section_data = {"type": "manual", "name": name, "depth": depth, "Z": Z, "I": I}
+        
+        elif custom_option == "Import DXF":
+            # Call the function which now handles compound sections internally
+            custom_section_data = get_custom_profile()
+
+    full_run = st.session_state.pop("custom_profile_full_run", False)
+    if st.session_state.get("custom_section_data") != custom_section_data:
+        st.session_state["custom_section_data"] = custom_section_data
+        if not full_run:
+            st.rerun(scope="app")
 
+
+st.session_state["custom_profile_full_run"] = True
+custom_profile_input()
+custom_section_data = st.session_state["custom_section_data"]
 use_custom_section = custom_section_data.get("type") in ["manual", "dxf"]
 
 
@@ -131,17 +161,20 @@ uls_fig, sls_fig, util_fig, defl_values, Z_req_cm3, defl_limit = generate_plots(
 # ---------------------------
 # Layout: Display Figures & PDF Export
 # ---------------------------
+# No Plotly logo link in the modebar; the figures themselves are cached in generate_plots
+PLOTLY_CONFIG = {"displaylogo": False}
+
 col1, col2, col3 = st.columns([1, 1, 1.5])
 with col1:
-    st.plotly_chart(uls_fig, height=650, use_container_width=True)
+    st.plotly_chart(uls_fig, height=650, use_container_width=True, config=PLOTLY_CONFIG)
     # pdf_uls = get_pdf_bytes(uls_fig)
     # st.download_button("Download ULS PDF", data=pdf_uls, file_name="ULS_Design.pdf", mime="application/pdf")
 with col2:
-    st.plotly_chart(sls_fig, height=650, use_container_width=True)
+    st.plotly_chart(sls_fig, height=650, use_container_width=True, config=PLOTLY_CONFIG)
     # pdf_sls = get_pdf_bytes(sls_fig)
     # st.download_button("Download SLS PDF", data=pdf_sls, file_name="SLS_Design.pdf", mime="application/pdf")
 with col3:
-    st.plotly_chart(util_fig, height=650, use_container_width=True)
+    st.plotly_chart(util_fig, height=650, use_container_width=True, config=PLOTLY_CONFIG)
     # pdf_util = get_pdf_bytes(util_fig)
     # st.download_button("Download Utilisation PDF", data=pdf_util, file_name="3D_Utilisation.pdf", mime="application/pdf")
 
@@ -1,22 +1,77 @@
+import functools
 import io
-import pandas as pd
-import plotly.io as pio
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch, mm
-from reportlab.pdfgen import canvas
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
-import matplotlib.pyplot as plt
-import base64
-from PIL import Image as PILImage
+import plotly.graph_objects as go
+import streamlit as st
 
+# reportlab is imported inside the report functions, so sessions that never export don't load it
+
+@st.cache_resource(show_spinner=False)
+def _start_kaleido_server():
+    """Keep one Chrome open for all later renders instead of launching one per image."""
+    import kaleido
+    kaleido.start_sync_server(silence_warnings=True)
+
+# Kaleido takes a second or two per image, so renders are cached by the figure's JSON
+@st.cache_data(show_spinner=False, max_entries=16, hash_funcs={go.Figure: lambda fig: fig.to_json()})
 def get_pdf_bytes(fig):
     """Convert a plotly figure to PDF bytes"""
     img_bytes = fig.to_image(format="png", width=1000, height=600)
+    # Started only after a render succeeds: a server without Chrome hangs instead of raising
+    _start_kaleido_server()
     return io.BytesIO(img_bytes)
 
+@functools.lru_cache(maxsize=None)
+def _report_styles():
+    """Paragraph and table styles shared by every report, built on the first one."""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.platypus import TableStyle
+    
+    styles = getSampleStyleSheet()
+    
+    # Create custom styles
+    title_style = ParagraphStyle(
+        'Title',
+        parent=styles['Title'],
+        fontSize=16,
+        alignment=TA_CENTER,
+        spaceAfter=12
+    )
+    
+    heading_style = ParagraphStyle(
+        'Heading1',
+        parent=styles['Heading1'],
+        fontSize=14,
+        spaceAfter=10
+    )
+    
+    normal_style = ParagraphStyle(
+        'Normal',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6
+    )
+    
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    
+    return title_style, heading_style, normal_style, table_style
+
+def _parameter_table(rows, doc_width, style):
+    """Two-column Parameter/Value table, as used for the inputs and the requirements."""
+    from reportlab.platypus import Table
+    return Table([["Parameter", "Value"]] + rows, colWidths=[doc_width/2.5, doc_width/2.5], style=style)
+
 def create_pdf_report(
     wind_pressure, bay_width, mullion_length, selected_barrier_load,
     ULS_case, SLS_case, plot_material, Z_req_cm3, I_req_cm4, defl_limit,
@@ -61,6 +116,11 @@ def create_pdf_report(
     BytesIO
         PDF document as bytes
     """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
+    
     buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer, 
@@ -71,42 +131,7 @@ def create_pdf_report(
         bottomMargin=20*mm
     )
     
-    styles = getSampleStyleSheet()
-    
-    # Create custom styles
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Title'],
-        fontSize=16,
-        alignment=TA_CENTER,
-        spaceAfter=12
-    )
-    
-    heading_style = ParagraphStyle(
-        'Heading1',
-        parent=styles['Heading1'],
-        fontSize=14,
-        spaceAfter=10
-    )
-    
-    normal_style = ParagraphStyle(
-        'Normal',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6
-    )
-    
-    table_style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-    ])
+    title_style, heading_style, normal_style, table_style = _report_styles()
     
     # Build the PDF content
     elements = []
@@ -118,8 +143,7 @@ def create_pdf_report(
     # Input parameters table
     elements.append(Paragraph("Design Input Parameters", heading_style))
     
-    data = [
-        ["Parameter", "Value"],
+    elements.append(_parameter_table([
         ["Material", plot_material],
         ["Wind Pressure", f"{wind_pressure:.2f} kPa"],
         ["Bay Width", f"{bay_width} mm"],
@@ -127,11 +151,7 @@ def create_pdf_report(
         ["Barrier Load", f"{selected_barrier_load:.2f} kN/m"],
         ["Current ULS Load Case", ULS_case],
         ["Current SLS Load Case", SLS_case]
-    ]
-    
-    t = Table(data, colWidths=[doc.width/2.5, doc.width/2.5])
-    t.setStyle(table_style)
-    elements.append(t)
+    ], doc.width, table_style))
     elements.append(Spacer(1, 10*mm))
     
     # ULS Load cases table 
@@ -139,9 +159,9 @@ def create_pdf_report(
         elements.append(Paragraph("Ultimate Limit State (ULS) Load Cases", heading_style))
         
         # Prepare ULS table data
-        uls_table_data = [uls_df.columns.tolist()]
-        for _, row in uls_df.iterrows():
-            uls_table_data.append(row.tolist())
+        uls_table_data = [uls_df.columns.tolist()] + [
+            [f"{v:.2f}" if isinstance(v, float) else v for v in row] for row in uls_df.to_numpy().tolist()
+        ]
         
         uls_table = Table(uls_table_data, colWidths=[doc.width/4, doc.width/4, doc.width/4])
         uls_table.setStyle(table_style)
@@ -153,9 +173,9 @@ def create_pdf_report(
         elements.append(Paragraph("Serviceability Limit State (SLS) Load Cases", heading_style))
         
         # Prepare SLS table data
-        sls_table_data = [sls_df.columns.tolist()]
-        for _, row in sls_df.iterrows():
-            sls_table_data.append(row.tolist())
+        sls_table_data = [sls_df.columns.tolist()] + [
+            [f"{v:.2f}" if isinstance(v, float) else v for v in row] for row in sls_df.to_numpy().tolist()
+        ]
         
         sls_table = Table(sls_table_data, colWidths=[doc.width/4, doc.width/4, doc.width/4])
         sls_table.setStyle(table_style)
@@ -165,16 +185,11 @@ def create_pdf_report(
     # Design requirements table
     elements.append(Paragraph("Design Requirements", heading_style))
     
-    data = [
-        ["Parameter", "Value"],
+    elements.append(_parameter_table([
         ["Required Section Modulus", f"{Z_req_cm3:.2f} cm³"],
         ["Required Moment of Inertia", f"{I_req_cm4:.2f} cm⁴"],
         ["Deflection Limit", f"{defl_limit:.2f} mm"]
-    ]
-    
-    t = Table(data, colWidths=[doc.width/2.5, doc.width/2.5])
-    t.setStyle(table_style)
-    elements.append(t)
+    ], doc.width, table_style))
     elements.append(Spacer(1, 10*mm))
     
     # Selected sections
@@ -203,29 +218,21 @@ def create_pdf_report(
     headers = ["Supplier", "Profile Name", "Depth (mm)", "Z (cm³)", 
                "I (cm⁴)", "ULS Util. (%)", "SLS Util. (%)"]
     
-    data = [headers]
-    
-    # Add rows for each selected section
-    for _, row in df_to_show.iterrows():
-        data.append([
-            row["Supplier"],
-            row["Profile Name"],
-            f"{row['Depth']:.1f}",
-            f"{row['Z (cm³)']:.2f}",
-            f"{row['I (cm⁴)']:.2f}",
-            f"{row['ULS Util. (%)']:.1f}",
-            f"{row['SLS Util. (%)']:.1f}"
-        ])
-    
-    # Alternate row colors
-    for i in range(len(df_to_show)):
-        if i % 2 == 0:
-            table_style.add('BACKGROUND', (0, i+1), (-1, i+1), colors.lightgrey)
+    # Add rows for each selected section, formatted from the column lists
+    data = [headers] + [
+        [supp, prof, f"{depth:.1f}", f"{z:.2f}", f"{i:.2f}", f"{uls:.1f}", f"{sls:.1f}"]
+        for supp, prof, depth, z, i, uls, sls in zip(*(
+            df_to_show[col].tolist() for col in
+            ["Supplier", "Profile Name", "Depth", "Z (cm³)", "I (cm⁴)", "ULS Util. (%)", "SLS Util. (%)"]
+        ))
+    ]
     
     # Create the table
     col_widths = [doc.width/8, doc.width/6, doc.width/10, doc.width/7, doc.width/7, doc.width/8, doc.width/8]
     t = Table(data, colWidths=col_widths)
     t.setStyle(table_style)
+    # Alternate row colors: grey on every other body row, starting with the first
+    t.setStyle([('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.lightgrey, None])])
     elements.append(t)
     
     # Add notes section
@@ -242,6 +249,8 @@ def create_pdf_report(
     buffer.seek(0)
     return buffer
 
+# Downloading the same report again (or after toggling a section back) skips ReportLab
+@st.cache_data(show_spinner=False, max_entries=16)
 def export_section_report(
     wind_pressure, bay_width, mullion_length, selected_barrier_load,
     ULS_case, SLS_case, plot_material, Z_req_cm3, defl_limit,
@@ -265,25 +274,11 @@ def export_section_report(
         PDF document as bytes
     """
     from config import material_props
+    from calc import required_inertia
     
-    # Calculate the required moment of inertia
+    # Calculate the required moment of inertia for the SLS case, converted to cm⁴
     E = material_props[plot_material]["E"]
-    p = wind_pressure * 0.001  # Convert kPa to N/mm²
-    L = mullion_length
-    bay = bay_width
-    w = p * bay
-    
-    # Calculate required I based on SLS case
-    if SLS_case.startswith("SLS 1"):
-        # For wind load case
-        I_req = (5 * w * L**4) / (384 * E * defl_limit)
-    else:
-        # For barrier load case
-        from config import BARRIER_LENGTH
-        F_BL = selected_barrier_load * bay
-        I_req = ((F_BL * BARRIER_LENGTH) / (12 * E * defl_limit)) * (0.75 * L**2 - BARRIER_LENGTH**2)
-    
-    # Convert to cm⁴
+    I_req = required_inertia(SLS_case, wind_pressure, bay_width, mullion_length, selected_barrier_load, E, defl_limit)
     I_req_cm4 = I_req / 10000
     
     # Generate load case tables
@@ -319,38 +314,43 @@ def generate_pdf_download_button(
     """
     import streamlit as st
     
-    # Create section selection multi-select
-    section_options = []
-    for idx, row in df_display.iterrows():
-        uls_status = "✅" if row["ULS Util. (%)"] <= 100 else "❌"
-        sls_status = "✅" if row["SLS Util. (%)"] <= 100 else "❌"
-        label = f"{row['Supplier']}: {row['Profile Name']} - {row['Depth']} mm (ULS: {uls_status}, SLS: {sls_status})"
-        section_options.append((idx, label))
-    
-    # Default to selecting passing sections
-    default_indices = []
-    for idx, row in df_display.iterrows():
-        if row["ULS Util. (%)"] <= 100 and row["SLS Util. (%)"] <= 100:
-            default_indices.append(idx)
-    
-    if len(default_indices) > 5:
-        default_indices = default_indices[:5]
-    
-    # Allow user to select sections for the report
+    def section_labels(rows):
+        """Multiselect label for each of the given sections, keyed by index."""
+        return {
+            idx: f"{supp}: {prof} - {depth:g} mm (ULS: {'✅' if uls <= 100 else '❌'}, SLS: {'✅' if sls <= 100 else '❌'})"
+            for idx, supp, prof, depth, uls, sls in zip(
+                rows.index.tolist(), rows["Supplier"].tolist(), rows["Profile Name"].tolist(),
+                rows["Depth"].tolist(), rows["ULS Util. (%)"].tolist(), rows["SLS Util. (%)"].tolist()
+            )
+        }
+    
+    # Default to selecting up to five passing sections
+    passing = (df_display["ULS Util. (%)"] <= 100).to_numpy() & (df_display["SLS Util. (%)"] <= 100).to_numpy()
+    default_indices = df_display.index[passing][:5].tolist()
+    
+    # Every section is only labelled and sent to the browser when the user wants to change
+    # the selection; otherwise the report uses the defaults
     st.subheader("Select Sections for Report")
-    selected_indices = st.multiselect(
-        "Choose sections to include in the PDF report:",
-        options=[idx for idx, _ in section_options],
-        default=default_indices,
-        format_func=lambda x: next((label for idx, label in section_options if idx == x), "Unknown")
-    )
-    
-    # Create the PDF bytes
-    pdf_bytes = export_section_report(
-        wind_pressure, bay_width, mullion_length, selected_barrier_load,
-        ULS_case, SLS_case, plot_material, Z_req_cm3, defl_limit,
-        df_display, selected_indices
-    )
+    if st.toggle("Choose sections", help="Off: the report includes up to five passing sections"):
+        labels = section_labels(df_display)
+        selected_indices = st.multiselect(
+            "Choose sections to include in the PDF report:",
+            options=list(labels),
+            default=default_indices,
+            format_func=lambda x: labels.get(x, "Unknown")
+        )
+    else:
+        selected_indices = default_indices
+        if default_indices:
+            st.caption("Included: " + "; ".join(section_labels(df_display.loc[default_indices]).values()))
+    
+    # Create the PDF bytes only when the button is clicked, not on every rerun
+    def pdf_bytes():
+        return export_section_report(
+            wind_pressure, bay_width, mullion_length, selected_barrier_load,
+            ULS_case, SLS_case, plot_material, Z_req_cm3, defl_limit,
+            df_display, selected_indices
+        )
     
     # Create download button
     return st.download_button(
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+import custom_profile
+
+
+class WorkerStartUnderStreamlitTest(unittest.TestCase):
+    """Streamlit runs the app script as __main__; workers must not re-run it."""
+
+    def setUp(self):
+        # Only freshly started workers exercise the start-up path
+        while custom_profile._IDLE_WORKERS:
+            custom_profile._stop_worker(custom_profile._IDLE_WORKERS.pop())
+
+    def test_worker_does_not_rerun_app_script(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            script = os.path.join(tmp_dir, "main.py")
+            with open(script, "w") as f:
+                f.write('raise SystemExit("the app script was re-run in the DXF worker")\n')
+
+            # As Streamlit's ScriptRunner does: a bare module whose __file__ is the app script
+            app_main = types.ModuleType("__main__")
+            app_main.__file__ = script
+            real_main = sys.modules["__main__"]
+            sys.modules["__main__"] = app_main
+            try:
+                self.assertTrue(custom_profile._run_in_worker(custom_profile._worker_ready))
+            finally:
+                sys.modules["__main__"] = real_main
+            self.assertIs(sys.modules["__main__"], real_main)
+
+
+if __name__ == "__main__":
+    unittest.main()